@@ -1,65 +1,243 @@
 """CPU functionality."""
 
 import sys
+from functools import partial
+
+HLT = 0b00000001
+LDI = 0b10000010
+PRN = 0b01000111
+PUSH = 0b01000101
+POP = 0b01000110
+CALL = 0b01010000
+RET = 0b00010001
+JMP = 0b01010100
+JEQ = 0b01010101
+JNE = 0b01010110
+ADD = 0b10100000
+MUL = 0b10100010
+CMP = 0b10100111
+
+SP = 7
+
+# Operand count (the AA bits of AABCDDDD) for every possible instruction byte
+OPERAND_COUNT = bytes(op >> 6 for op in range(256))
+
+# Returned by an instruction handler to halt the CPU
+STOP = object()
+
+# FL bits: 00000LGE
+FL_L = 0b100
+FL_G = 0b010
+FL_E = 0b001
+
 
 class CPU:
     """Main CPU class."""
 
     def __init__(self):
         """Construct a new CPU."""
-        pass
-
-    def load(self):
+        # RAM is private so every write goes through ram_write, which keeps
+        # the decode cache in step with memory
+        self._ram = bytearray(256)
+        self.reg = [0] * 8
+        self.reg[SP] = 0xF4
+        self.pc = 0
+        self.fl = 0
+
+        # Branch table indexed by the full instruction byte. Handlers take
+        # the address of the following instruction and return the address
+        # to continue at, or STOP to halt.
+        self._handlers = [None] * 256
+        self._handlers[HLT] = self._hlt
+        self._handlers[LDI] = self._ldi
+        self._handlers[PRN] = self._prn
+        self._handlers[PUSH] = self._push
+        self._handlers[POP] = self._pop
+        self._handlers[CALL] = self._call
+        self._handlers[RET] = self._ret
+        self._handlers[JMP] = self._jmp
+        self._handlers[JEQ] = self._jeq
+        self._handlers[JNE] = self._jne
+        self._handlers[ADD] = self._add
+        self._handlers[MUL] = self._mul
+        self._handlers[CMP] = self._cmp
+
+        # ALU operations by name, for alu()
+        self._alu_ops = {"ADD": self._add, "MUL": self._mul, "CMP": self._cmp}
+
+        # Decoded instructions, indexed by the address they were fetched from
+        self._decoded = [None] * 256
+
+    def ram_read(self, mar):
+        """Return the value stored in RAM at address MAR."""
+        return self._ram[mar]
+
+    def ram_write(self, mar, mdr):
+        """Store MDR in RAM at address MAR."""
+        self._ram[mar] = mdr & 0xFF
+
+        # Drop any cached instruction that this byte belongs to
+        self._decoded[mar] = None
+        self._decoded[mar - 1] = None
+        self._decoded[mar - 2] = None
+
+    def load(self, filename):
         """Load a program into memory."""
 
-        address = 0
+        with open(filename) as f:
+            data = f.read()
 
-        # For now, we've just hardcoded a program:
+        # One byte per line, written as 8 binary digits. Everything after a
+        # "#" is a comment, and lines with nothing else on them are skipped.
+        program = bytearray()
+        for number, line in enumerate(data.splitlines(), 1):
+            code = line.split("#", 1)[0].strip()[:8]
+            if not code:
+                continue
 
-        program = [
-            # From print8.ls8
-            0b10000010, # LDI R0,8
-            0b00000000,
-            0b00001000,
-            0b01000111, # PRN R0
-            0b00000000,
-            0b00000001, # HLT
-        ]
+            try:
+                program.append(int(code, 2))
+            except ValueError:
+                raise Exception(
+                    f"{filename}:{number}: not a binary byte: {line!r}"
+                ) from None
 
-        for instruction in program:
-            self.ram[address] = instruction
-            address += 1
+        if len(program) > len(self._ram):
+            raise Exception("Program does not fit in RAM")
 
+        # Clear whatever an earlier program left above this one
+        self._ram[:] = program + bytes(len(self._ram) - len(program))
+        self._decoded[:] = [None] * 256
 
     def alu(self, op, reg_a, reg_b):
         """ALU operations."""
 
-        if op == "ADD":
-            self.reg[reg_a] += self.reg[reg_b]
-        #elif op == "SUB": etc
-        else:
+        operation = self._alu_ops.get(op)
+        if operation is None:
             raise Exception("Unsupported ALU operation")
 
+        operation(reg_a, reg_b)
+
     def trace(self):
         """
         Handy function to print out the CPU state. You might want to call this
         from run() if you need help debugging.
         """
 
-        print(f"TRACE: %02X | %02X %02X %02X |" % (
-            self.pc,
-            #self.fl,
-            #self.ie,
-            self.ram_read(self.pc),
-            self.ram_read(self.pc + 1),
-            self.ram_read(self.pc + 2)
-        ), end='')
-
-        for i in range(8):
-            print(" %02X" % self.reg[i], end='')
-
-        print()
+        ram = self._ram
+        pc = self.pc
+        a = ram[(pc + 1) & 0xFF]
+        b = ram[(pc + 2) & 0xFF]
+
+        print(
+            f"TRACE: {pc:02X} | {ram[pc]:02X} {a:02X} {b:02X} |"
+            + "".join(f" {r:02X}" for r in self.reg)
+        )
+
+    def _err(self, ir, pc, operand_a, operand_b, next_pc):
+        print(f"Unknown instruction {ir:08b} at address {pc:02X}")
+        sys.exit(1)
+
+    def _hlt(self, operand_a, operand_b, next_pc):
+        return STOP
+
+    def _ldi(self, operand_a, operand_b, next_pc):
+        self.reg[operand_a] = operand_b
+        return next_pc
+
+    def _prn(self, operand_a, operand_b, next_pc):
+        print(self.reg[operand_a])
+        return next_pc
+
+    def _push(self, operand_a, operand_b, next_pc):
+        reg = self.reg
+        reg[SP] = (reg[SP] - 1) & 0xFF
+        self.ram_write(reg[SP], reg[operand_a])
+        return next_pc
+
+    def _pop(self, operand_a, operand_b, next_pc):
+        reg = self.reg
+        reg[operand_a] = self._ram[reg[SP]]
+        reg[SP] = (reg[SP] + 1) & 0xFF
+        return next_pc
+
+    def _call(self, operand_a, operand_b, next_pc):
+        reg = self.reg
+        reg[SP] = (reg[SP] - 1) & 0xFF
+        self.ram_write(reg[SP], next_pc)
+        return reg[operand_a]
+
+    def _ret(self, operand_a, operand_b, next_pc):
+        reg = self.reg
+        return_pc = self._ram[reg[SP]]
+        reg[SP] = (reg[SP] + 1) & 0xFF
+        return return_pc
+
+    def _jmp(self, operand_a, operand_b, next_pc):
+        return self.reg[operand_a]
+
+    def _jeq(self, operand_a, operand_b, next_pc):
+        return self.reg[operand_a] if self.fl & FL_E else next_pc
+
+    def _jne(self, operand_a, operand_b, next_pc):
+        return next_pc if self.fl & FL_E else self.reg[operand_a]
+
+    def _add(self, operand_a, operand_b, next_pc=None):
+        reg = self.reg
+        reg[operand_a] = (reg[operand_a] + reg[operand_b]) & 0xFF
+        return next_pc
+
+    def _mul(self, operand_a, operand_b, next_pc=None):
+        reg = self.reg
+        reg[operand_a] = (reg[operand_a] * reg[operand_b]) & 0xFF
+        return next_pc
+
+    def _cmp(self, operand_a, operand_b, next_pc=None):
+        a, b = self.reg[operand_a], self.reg[operand_b]
+        self.fl = (a < b) * FL_L | (a > b) * FL_G | (a == b) * FL_E
+        return next_pc
+
+    def _decode(self, pc):
+        """Decode the instruction at PC into (handler, a, b, next_pc)."""
+        ram = self._ram
+        ir = ram[pc]
+        operand_count = OPERAND_COUNT[ir]
+        operand_a = ram[(pc + 1) & 0xFF] if operand_count >= 1 else 0
+        operand_b = ram[(pc + 2) & 0xFF] if operand_count >= 2 else 0
+
+        handler = self._handlers[ir]
+        if handler is None:
+            # Only report the bad byte if execution actually reaches it
+            handler = partial(self._err, ir, pc)
+
+        return handler, operand_a, operand_b, (pc + 1 + operand_count) & 0xFF
 
     def run(self):
         """Run the CPU."""
-        pass
+        cache = self._decoded
+        decode = self._decode
+        reg = self.reg
+        ldi = self._handlers[LDI]
+
+        # The PC lives in a local while running and is stored back on HLT
+        pc = self.pc
+
+        while True:
+            decoded = cache[pc]
+            if decoded is None:
+                decoded = cache[pc] = decode(pc)
+
+            handler, operand_a, operand_b, next_pc = decoded
+
+            # LDI is the most common instruction in the example programs,
+            # so handle it here without a call
+            if handler is ldi:
+                reg[operand_a] = operand_b
+            else:
+                next_pc = handler(operand_a, operand_b, next_pc)
+                if next_pc is STOP:
+                    break
+
+            pc = next_pc
+
+        self.pc = pc
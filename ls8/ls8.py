@@ -5,7 +5,11 @@
 import sys
 from cpu import *
 
+if len(sys.argv) != 2:
+    print("Usage: ls8.py <program.ls8>")
+    sys.exit(1)
+
 cpu = CPU()
 
-cpu.load()
-cpu.run()
\ No newline at end of file
+cpu.load(sys.argv[1])
+cpu.run()
@@ -0,0 +1,224 @@
+"""Behavior checks for the LS-8 emulator."""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from cpu import CPU, FL_E, FL_G, FL_L
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(HERE, "examples")
+ASM = os.path.join(HERE, "..", "asm")
+
+# Example programs that only use instructions this CPU implements
+SUPPORTED = ["print8", "mult", "stack", "call", "sctest"]
+
+
+def expected_output(name):
+    """Return the "Expected output" block from asm/NAME.asm."""
+    with open(os.path.join(ASM, name + ".asm")) as f:
+        lines = f.read().splitlines()
+
+    for i, line in enumerate(lines):
+        if "Expected output:" in line:
+            inline = line.split(":", 1)[1].strip()
+            if inline:
+                return inline + "\n"
+
+            output = []
+            for comment in lines[i + 1:]:
+                value = comment.lstrip(";#").strip()
+                if not value:
+                    break
+                output.append(value + "\n")
+            return "".join(output)
+
+
+def run_cpu(cpu):
+    """Run CPU and return everything it printed."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        cpu.run()
+    return out.getvalue()
+
+
+def load_source(cpu, source):
+    """Load ls8 SOURCE text into CPU through a temporary file."""
+    with tempfile.NamedTemporaryFile("w", suffix=".ls8", delete=False) as f:
+        f.write(source)
+    try:
+        cpu.load(f.name)
+    finally:
+        os.remove(f.name)
+
+
+def write_program(cpu, program):
+    for address, byte in enumerate(program):
+        cpu.ram_write(address, byte)
+
+
+class ExampleProgramTest(unittest.TestCase):
+    def test_examples_match_expected_output(self):
+        for name in SUPPORTED:
+            with self.subTest(program=name):
+                cpu = CPU()
+                cpu.load(os.path.join(EXAMPLES, name + ".ls8"))
+                self.assertEqual(run_cpu(cpu), expected_output(name))
+
+
+class DecodeCacheTest(unittest.TestCase):
+    def test_push_over_cached_operand(self):
+        # The second pass through LDI R0 must see the byte PUSH wrote over
+        # its immediate, not the decoded copy from the first pass.
+        program = [
+            0b10000010, 0, 5,    # 00: LDI R0,5
+            0b01000111, 0,       # 03: PRN R0
+            0b10000010, 1, 1,    # 05: LDI R1,1
+            0b10100000, 4, 1,    # 08: ADD R4,R1
+            0b10000010, 2, 2,    # 0B: LDI R2,2
+            0b10000010, 3, 35,   # 0E: LDI R3,Done
+            0b10100111, 4, 2,    # 11: CMP R4,R2
+            0b01010101, 3,       # 14: JEQ R3
+            0b10000010, 2, 9,    # 16: LDI R2,9
+            0b10000010, 7, 3,    # 19: LDI R7,3
+            0b01000101, 2,       # 1C: PUSH R2 (writes address 02)
+            0b10000010, 3, 0,    # 1E: LDI R3,0
+            0b01010100, 3,       # 21: JMP R3
+            0b00000001,          # 23: Done: HLT
+        ]
+        cpu = CPU()
+        write_program(cpu, program)
+        self.assertEqual(run_cpu(cpu), "5\n9\n")
+
+    def test_next_pc_wraps_past_top_of_ram(self):
+        cpu = CPU()
+        write_program(cpu, [0b01000111, 0, 0b00000001])  # 00: PRN R0, HLT
+        for address, byte in zip(range(0xFD, 0x100), [0b10000010, 0, 7]):
+            cpu.ram_write(address, byte)  # FD: LDI R0,7
+        cpu.pc = 0xFD
+        self.assertEqual(run_cpu(cpu), "7\n")
+
+    def test_operands_wrap_past_top_of_ram(self):
+        cpu = CPU()
+        # 00: immediate for the LDI at FE, then PRN R0, HLT
+        write_program(cpu, [42, 0b01000111, 0, 0b00000001])
+        cpu.ram_write(0xFE, 0b10000010)  # FE: LDI R0,42
+        cpu.ram_write(0xFF, 0)
+        cpu.pc = 0xFE
+        self.assertEqual(run_cpu(cpu), "42\n")
+
+    def test_ram_write_after_run(self):
+        cpu = CPU()
+        cpu.load(os.path.join(EXAMPLES, "print8.ls8"))
+        self.assertEqual(run_cpu(cpu), "8\n")
+
+        cpu.pc = 0
+        cpu.ram_write(2, 9)  # immediate of LDI R0,8
+        self.assertEqual(run_cpu(cpu), "9\n")
+
+    def test_reload_after_run(self):
+        cpu = CPU()
+        cpu.load(os.path.join(EXAMPLES, "mult.ls8"))
+        self.assertEqual(run_cpu(cpu), "72\n")
+
+        cpu.pc = 0
+        cpu.load(os.path.join(EXAMPLES, "print8.ls8"))
+        self.assertEqual(run_cpu(cpu), "8\n")
+
+        # mult.ls8 is longer than print8.ls8; none of it may remain
+        for address in range(6, 256):
+            self.assertEqual(cpu.ram_read(address), 0)
+
+
+class AluTest(unittest.TestCase):
+    def test_cmp_sets_one_flag(self):
+        cases = [(3, 5, FL_L), (5, 3, FL_G), (4, 4, FL_E)]
+        for a, b, flag in cases:
+            with self.subTest(a=a, b=b):
+                cpu = CPU()
+                cpu.reg[0], cpu.reg[1] = a, b
+                cpu.alu("CMP", 0, 1)
+                self.assertEqual(cpu.fl, flag)
+
+
+class StackTest(unittest.TestCase):
+    def test_stack_pointer_wraps(self):
+        # POP from FF wraps SP to 00; PUSH from 00 wraps SP back to FF
+        program = [
+            0b10000010, 7, 0xFF,  # 00: LDI SP,FF
+            0b01000110, 0,        # 03: POP R0
+            0b01000111, 7,        # 05: PRN SP
+            0b01000101, 0,        # 07: PUSH R0
+            0b01000111, 7,        # 09: PRN SP
+            0b00000001,           # 0B: HLT
+        ]
+        cpu = CPU()
+        write_program(cpu, program)
+        cpu.ram_write(0xFF, 33)
+        self.assertEqual(run_cpu(cpu), "0\n255\n")
+        self.assertEqual(cpu.reg[0], 33)
+
+
+class TraceTest(unittest.TestCase):
+    def test_trace_format(self):
+        cpu = CPU()
+        write_program(cpu, [0x0B, 0x0C])
+        cpu.ram_write(0xFF, 0x0A)
+        cpu.pc = 0xFF
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            cpu.trace()
+        self.assertEqual(
+            out.getvalue(),
+            "TRACE: FF | 0A 0B 0C | 00 00 00 00 00 00 00 F4\n",
+        )
+
+
+class LoadTest(unittest.TestCase):
+    def test_blank_lines_and_comments_are_skipped(self):
+        source = (
+            "# print8 with extra layout\n"
+            "10000010 # LDI R0,8\n"
+            "   \n"
+            "00000000\n"
+            "\t00001000\n"
+            "  # indented comment\n"
+            "01000111# PRN R0\n"
+            "00000000\n"
+            "00000001\n"
+        )
+        cpu = CPU()
+        load_source(cpu, source)
+        self.assertEqual(run_cpu(cpu), "8\n")
+
+    def test_only_first_eight_digits_are_read(self):
+        cpu = CPU()
+        load_source(
+            cpu,
+            "10000010 LDI R0,8\n00000000\n00001000\n"
+            "01000111PRN\n00000000\n00000001\n",
+        )
+        self.assertEqual(run_cpu(cpu), "8\n")
+
+    def test_bad_line_is_named(self):
+        cpu = CPU()
+        with self.assertRaisesRegex(Exception, r":2: not a binary byte: 'LDI'"):
+            load_source(cpu, "00000001\nLDI\n")
+
+
+class ErrorTest(unittest.TestCase):
+    def test_unknown_instruction_reports_its_own_byte(self):
+        cpu = CPU()
+        load_source(cpu, "10000100\n00000000\n00000001\n00000001\n")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), self.assertRaises(SystemExit):
+            cpu.run()
+        self.assertEqual(
+            out.getvalue(), "Unknown instruction 10000100 at address 00\n"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()